@@ -1,10 +1,322 @@
+import asyncio
 import base64
+import binascii
+import copy
+import hashlib
 import io
-from typing import List, Optional, Dict, Any
+import os
+import threading
+import urllib.parse
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import httpx
-from openai import OpenAI
-from PIL import Image
+from openai import AsyncOpenAI, OpenAI
+from PIL import Image, features
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# simplejpeg (libjpeg-turbo) is an optional, faster JPEG encoder. When it is
+# not installed, images are encoded with PIL instead.
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+# OpenCV, when installed, encodes NumPy arrays directly without going through
+# a PIL image.
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Images may be given as PIL images, RGB NumPy arrays, already-encoded bytes, or
+# a file path, data URL or http(s) URL. Encoded inputs are sent as-is, without
+# a decode/encode round trip.
+ImageInput = Union[Image.Image, "np.ndarray", bytes, str, os.PathLike]
+
+# The format that PIL images are encoded to before being sent. WebP is smaller
+# than JPEG at similar quality, but needs a Pillow build with WebP support.
+ImageFormat = Literal["jpeg", "webp"]
+_WEBP_AVAILABLE = features.check("webp")
+
+# Data URL prefixes for the common MIME types, built once so that each image
+# URL is a single concatenation with its Base64 payload.
+_DATA_URL_PREFIXES = {
+    mime_type: f"data:{mime_type};base64,"
+    for mime_type in ("image/jpeg", "image/png", "image/webp", "image/gif")
+}
+
+# Per-thread BytesIO reused across encodes to reduce allocator churn. Buffers
+# that grew beyond _MAX_POOLED_BUFFER bytes are dropped instead of kept.
+_buffer_local = threading.local()
+_MAX_POOLED_BUFFER = 8 * 1024 * 1024
+
+# Bounds for the per-client cache of encoded images.
+_B64_CACHE_SIZE = 32
+_B64_CACHE_MAX_PIXELS = 4_000_000
+
+# orjson is an optional, much faster serializer for request bodies, which can
+# carry several megabytes of Base64 image data.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# httpx needs the h2 package to speak HTTP/2.
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+def _sniff_mime(data: bytes) -> str:
+    """
+    Guesses the MIME type of encoded image data.
+
+    Common formats are recognized from their magic bytes; anything else is
+    identified by PIL from the image header.
+
+    Args:
+        data (bytes): The encoded image.
+
+    Returns:
+        str: The MIME type of the image.
+
+    Raises:
+        ValueError: If the data is not in an image format PIL recognizes.
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            mime_type = image.get_format_mimetype()
+    except OSError:
+        mime_type = None
+    if not mime_type:
+        raise ValueError("Image data is not in a recognized image format.")
+    return mime_type
+
+
+def _data_url_mime(data: bytes) -> str:
+    """
+    Returns the MIME type for a data URL that does not declare one.
+
+    Args:
+        data (bytes): The decoded payload of the data URL.
+
+    Returns:
+        str: The sniffed image MIME type, or 'text/plain' (the RFC 2397
+             default) if the payload is not a recognized image.
+    """
+    try:
+        return _sniff_mime(data)
+    except ValueError:
+        return "text/plain"
+
+
+@lru_cache(maxsize=64)
+def _system_message(system_prompt: str) -> Dict[str, Any]:
+    """
+    Returns the system message for a prompt, reusing it across calls.
+
+    The returned dict is shared between requests and must not be mutated.
+
+    Args:
+        system_prompt (str): The system-level instruction for the model.
+
+    Returns:
+        Dict[str, Any]: The system message.
+    """
+    return {"role": "system", "content": system_prompt}
+
+
+def _ndarray_to_uint8(array: "np.ndarray") -> "np.ndarray":
+    """
+    Converts an image array to uint8, as expected by the image encoders.
+
+    Float arrays holding values in [0, 1], as produced by e.g. torch
+    pipelines, are scaled to [0, 255]. Float arrays with larger values, such
+    as `img.astype(np.float32)` of OpenCV output, are taken to already be in
+    [0, 255]. Single-channel (H, W, 1) arrays are reduced to (H, W).
+
+    Args:
+        array (np.ndarray): The image as an (H, W) or (H, W, C) array.
+
+    Returns:
+        np.ndarray: The image as a uint8 array.
+
+    Raises:
+        ValueError: If the array is neither uint8 nor floating point.
+    """
+    if array.ndim == 3 and array.shape[2] == 1:
+        array = array[..., 0]
+
+    if array.dtype == np.uint8:
+        return array
+    if array.dtype.kind == "f":
+        scale = 255.0 if array.size and array.max() <= 1.0 else 1.0
+        return (np.clip(array * scale, 0.0, 255.0) + 0.5).astype(np.uint8)
+    raise ValueError(
+        f"Unsupported image array dtype {array.dtype}: expected uint8, or "
+        "floating point values in [0, 1] or [0, 255]."
+    )
+
+
+def _ndarray_to_base64(
+    array: "np.ndarray", max_side: Optional[int], use_webp: bool
+) -> Tuple[str, str]:
+    """
+    Encodes an RGB(A) or grayscale uint8 NumPy array with OpenCV.
+
+    Arrays are assumed to be in RGB channel order, as with
+    `Image.fromarray`, and are converted to OpenCV's BGR order before encoding.
+    Any alpha channel is dropped.
+
+    Args:
+        array (np.ndarray): The image as an (H, W) or (H, W, C) array.
+        max_side (Optional[int]): Images whose longest side exceeds this many
+                                  pixels are downscaled before encoding.
+        use_webp (bool): Whether to encode as WebP instead of JPEG. Falls back
+                         to JPEG if this OpenCV build cannot write WebP.
+
+    Returns:
+        Tuple[str, str]: The MIME type of the encoded image and its Base64
+                         encoded string representation.
+    """
+    if array.ndim == 3:
+        if array.shape[2] == 4:
+            array = cv2.cvtColor(array, cv2.COLOR_RGBA2BGR)
+        elif array.shape[2] == 3:
+            array = cv2.cvtColor(array, cv2.COLOR_RGB2BGR)
+
+    if max_side:
+        h, w = array.shape[:2]
+        scale = max_side / max(w, h)
+        if scale < 1:
+            array = cv2.resize(
+                array,
+                (max(1, int(w * scale)), max(1, int(h * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+
+    ok = False
+    if use_webp:
+        # OpenCV builds without WebP support raise here; fall back to JPEG.
+        try:
+            ok, encoded = cv2.imencode(
+                ".webp", array, [cv2.IMWRITE_WEBP_QUALITY, 80]
+            )
+        except cv2.error:
+            ok = False
+        mime_type = "image/webp"
+    if not ok:
+        ok, encoded = cv2.imencode(".jpg", array, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        mime_type = "image/jpeg"
+    if not ok:
+        raise ValueError("OpenCV failed to encode the image array.")
+
+    return mime_type, base64.b64encode(encoded).decode("ascii")
+
+
+def _orjson_options(options: Any) -> Any:
+    """
+    Pre-serializes the JSON body of an OpenAI SDK request with orjson.
+
+    The SDK serializes request bodies itself (with `json.dumps`) before they
+    reach httpx, so this hooks in one step earlier: the body, merged with any
+    `extra_body`, is replaced by the orjson-encoded bytes, which the SDK then
+    sends as-is. Options are returned unchanged when orjson is not installed,
+    the request has no JSON body, or orjson cannot serialize it.
+
+    Args:
+        options (FinalRequestOptions): The SDK's options for one request.
+
+    Returns:
+        FinalRequestOptions: The options to build the request from.
+    """
+    json_data = options.json_data
+    if (
+        orjson is None
+        or not isinstance(json_data, Mapping)
+        or options.files is not None
+        or getattr(options, "content", None) is not None
+    ):
+        return options
+
+    if options.extra_json:
+        json_data = {**json_data, **options.extra_json}
+    try:
+        body = orjson.dumps(json_data)
+    except TypeError:
+        return options
+
+    options = copy.copy(options)
+    options.json_data = body
+    options.extra_json = None
+    return options
+
+
+class _OrjsonOpenAI(OpenAI):
+    def _build_request(self, options: Any, **kwargs) -> httpx.Request:
+        return super()._build_request(_orjson_options(options), **kwargs)
+
+
+class _AsyncOrjsonOpenAI(AsyncOpenAI):
+    def _build_request(self, options: Any, **kwargs) -> httpx.Request:
+        return super()._build_request(_orjson_options(options), **kwargs)
+
+
+class _BytesBodyMixin:
+    """
+    Makes an httpx client accept a pre-serialized JSON body.
+
+    Older OpenAI SDKs hand the request body to httpx as `json=`, which would
+    serialize the bytes produced by `_orjson_options` a second time; they are
+    sent as the request content instead.
+    """
+
+    def build_request(self, *args, json: Any = None, **kwargs) -> httpx.Request:
+        if isinstance(json, bytes):
+            headers = httpx.Headers(kwargs.get("headers"))
+            headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+            kwargs["content"] = json
+            json = None
+        return super().build_request(*args, json=json, **kwargs)
+
+
+class _HttpClient(_BytesBodyMixin, httpx.Client):
+    pass
+
+
+class _AsyncHttpClient(_BytesBodyMixin, httpx.AsyncClient):
+    pass
+
 
 class LlamaLiteClient:
     """
@@ -18,64 +330,472 @@ class LlamaLiteClient:
     Attributes:
         client (OpenAI): An instance of the OpenAI client, configured to
                          communicate with the llama.cpp server.
+        aclient (AsyncOpenAI): An asynchronous OpenAI client with the same
+                               configuration, bound to the running event loop
+                               and used by `achat`. Call `aclose()` before the
+                               loop finishes.
     """
 
-    def __init__(self, base_url: str = "http://localhost:8080/v1"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8080/v1",
+        max_connections: int = 100,
+        max_keepalive_connections: Optional[int] = None,
+        read_timeout: Optional[float] = 600.0,
+        warmup: bool = True,
+    ):
         """
         Initializes the LlamaLiteClient.
 
+        The client holds a pool of keep-alive connections and is meant to be
+        long-lived: create one instance and reuse it for every request rather
+        than instantiating a new client per call, and call `close()` (and
+        `aclose()` after using `achat`) when done with it.
+
         Args:
             base_url (str): The base URL of the llama.cpp server. This should
                             point to the server's API endpoint, typically ending
                             in '/v1'.
+            max_connections (int): The maximum number of concurrent connections
+                                   to the server.
+            max_keepalive_connections (Optional[int]): The maximum number of idle
+                                                       connections kept open.
+                                                       Defaults to
+                                                       `max_connections` so that
+                                                       bursts don't close sockets.
+            read_timeout (Optional[float]): Seconds to wait for data from the
+                                            server before giving up. None waits
+                                            forever, which hangs on a stalled
+                                            server.
+            warmup (bool): Whether to issue a cheap request to the server on
+                           initialization, so that the first chat does not pay
+                           for the TCP/TLS handshake.
         """
+        if max_keepalive_connections is None:
+            max_keepalive_connections = max_connections
+
         # Explicitly create an httpx.Client to pass to the OpenAI client.
         # This can prevent a TypeError related to an unexpected 'proxies'
         # argument that may occur with certain versions of the openai and
         # httpx libraries.
-        http_client = httpx.Client(
+        # HTTP/2 lets concurrent chats share one connection when the server
+        # sits behind a proxy that supports it; httpx negotiates down to
+        # HTTP/1.1 otherwise.
+        client_kwargs = dict(
             base_url=base_url,
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=_HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(
+                connect=5.0, read=read_timeout, write=30.0, pool=5.0
+            ),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
         )
+        http_client = _HttpClient(**client_kwargs)
 
-        self.client = OpenAI(
+        self.client = _OrjsonOpenAI(
             base_url=base_url,
             api_key="sk-no-key-required",  # API key is not required for local server.
             http_client=http_client,
         )
 
+        # The async client is created lazily, since its pooled connections are
+        # bound to the event loop that opened them; see `aclient`.
+        self._client_kwargs = client_kwargs
+        self._aclient: Optional[AsyncOpenAI] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._aclient_lock = threading.Lock()
+
+        # Encoded images, keyed by a hash of their pixels, so that images
+        # resent across turns are not re-encoded. Evicted in FIFO order.
+        self._b64_cache: Dict[bytes, Tuple[str, str]] = {}
+        self._b64_cache_lock = threading.Lock()
+
+        # Pre-warm the connection pool. Failures are ignored, since the server
+        # may not be up yet and the first chat will simply connect on demand.
+        if warmup:
+            try:
+                http_client.get("models", timeout=2.0)
+            except Exception:
+                pass
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        The asynchronous OpenAI client, bound to the running event loop.
+
+        Pooled async connections cannot outlive the event loop that opened
+        them, so the client is created on first use in a loop and must be
+        closed with `aclose()` before that loop finishes. Only one event loop
+        can use the async client at a time.
+
+        Returns:
+            AsyncOpenAI: The client bound to the running event loop.
+
+        Raises:
+            RuntimeError: If the async client is in use by another event loop
+                          that is still open.
+        """
+        loop = asyncio.get_running_loop()
+        with self._aclient_lock:
+            if self._aclient is not None and self._aclient_loop is not loop:
+                if not self._aclient_loop.is_closed():
+                    raise RuntimeError(
+                        "The async client is in use by another event loop; call "
+                        "aclose() from that loop before using it from this one."
+                    )
+                warnings.warn(
+                    "LlamaLiteClient.aclose() was not called before its event "
+                    "loop finished, so its pooled connections were leaked.",
+                    ResourceWarning,
+                    stacklevel=2,
+                )
+                self._aclient = None
+
+            if self._aclient is None:
+                self._aclient = _AsyncOrjsonOpenAI(
+                    base_url=self._client_kwargs["base_url"],
+                    api_key="sk-no-key-required",
+                    http_client=_AsyncHttpClient(**self._client_kwargs),
+                )
+                self._aclient_loop = loop
+            return self._aclient
+
+    async def aclose(self) -> None:
+        """
+        Closes the async client and its pooled connections.
+
+        Must be called from the event loop that used `achat`, before that loop
+        finishes. The client can be used again afterwards, from any loop.
+        """
+        with self._aclient_lock:
+            if self._aclient_loop is not asyncio.get_running_loop():
+                return
+            aclient, self._aclient = self._aclient, None
+            self._aclient_loop = None
+        if aclient is not None:
+            await aclient.close()
+
+    def close(self) -> None:
+        """
+        Closes the synchronous client and its pooled connections.
+        """
+        self.client.close()
 
     @staticmethod
-    def _pil_image_to_base64(image: Image.Image) -> str:
+    def _pil_image_to_base64(
+        image: ImageInput,
+        max_side: Optional[int] = 1024,
+        image_format: ImageFormat = "jpeg",
+    ) -> Tuple[Optional[str], str]:
         """
         Converts a PIL Image object to a Base64 encoded string.
 
         This is a helper method to format images into the required string
-        representation for the chat completions API.
+        representation for the chat completions API. Images are encoded with
+        simplejpeg when it is available, falling back to PIL otherwise; either
+        way the output is JPEG unless WebP is requested. NumPy arrays are
+        encoded with OpenCV when it is installed, bypassing PIL.
+        Already-encoded images (bytes, file paths and data URLs) are passed
+        through without re-encoding, and are not resized. http(s) URLs are
+        passed through as-is for the server to fetch.
 
         Args:
-            image (Image.Image): The PIL Image object to be converted.
+            image (ImageInput): The PIL Image object, RGB NumPy array, encoded
+                                image bytes, file path, data URL or http(s)
+                                URL to be converted.
+            max_side (Optional[int]): Images whose longest side exceeds this
+                                      many pixels are downscaled before
+                                      encoding. None disables resizing.
+            image_format (ImageFormat): The format to encode images to. Falls
+                                        back to JPEG if the encoder (Pillow, or
+                                        OpenCV for NumPy arrays) cannot write
+                                        WebP.
 
         Returns:
-            str: A Base64 encoded string representation of the image.
+            Tuple[Optional[str], str]: The MIME type of the encoded image and
+                                       its Base64 encoded string
+                                       representation, or None and the URL
+                                       for an http(s) URL.
+
+        Raises:
+            ValueError: If encoded image data is not in a recognized format.
         """
-        with io.BytesIO() as buffered:
-            # Determine the image format, defaulting to PNG if not available.
-            img_format = image.format if image.format else "PNG"
-            image.save(buffered, format=img_format)
-            img_bytes = buffered.getvalue()
-        
-        return base64.b64encode(img_bytes).decode("utf-8")
+        if isinstance(image, str) and image.startswith(("http://", "https://")):
+            return None, image
+
+        if isinstance(image, str) and image.startswith("data:"):
+            header, _, data = image.partition(",")
+            mime_type, *params = header[len("data:"):].split(";")
+            if "base64" in params:
+                if not mime_type:
+                    try:
+                        raw = base64.b64decode(data + "=" * (-len(data) % 4))
+                    except binascii.Error:
+                        raw = b""
+                    mime_type = _data_url_mime(raw)
+                return mime_type, data
+            # Data URLs without ';base64' carry a percent-encoded payload.
+            raw = urllib.parse.unquote_to_bytes(data)
+            return (
+                mime_type or _data_url_mime(raw),
+                base64.b64encode(raw).decode("ascii"),
+            )
+
+        if isinstance(image, (str, os.PathLike)):
+            with open(image, "rb") as f:
+                image = f.read()
+
+        if isinstance(image, (bytes, bytearray)):
+            return _sniff_mime(image), base64.b64encode(image).decode("ascii")
+
+        use_webp = image_format == "webp" and _WEBP_AVAILABLE
+
+        if np is not None and isinstance(image, np.ndarray):
+            image = _ndarray_to_uint8(image)
+            if cv2 is not None:
+                return _ndarray_to_base64(image, max_side, image_format == "webp")
+            image = Image.fromarray(image)
+
+        # Convert before resizing: Pillow resizes "P" and "1" images with
+        # NEAREST regardless of the requested filter.
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        if max_side:
+            w, h = image.size
+            scale = max_side / max(w, h)
+            if scale < 1:
+                image = image.resize(
+                    (max(1, int(w * scale)), max(1, int(h * scale))),
+                    Image.Resampling.LANCZOS,
+                )
+
+        if simplejpeg is not None and not use_webp:
+            # Use 4:2:0 chroma subsampling, matching the PIL path below.
+            jpg = simplejpeg.encode_jpeg(
+                np.asarray(image),
+                quality=85,
+                colorspace="RGB",
+                colorsubsampling="420",
+            )
+            return "image/jpeg", base64.b64encode(jpg).decode("ascii")
+
+        # Take this thread's pooled buffer, if any. It is not truncated, since
+        # that can release its memory; only the first `size` bytes are used.
+        buffered = getattr(_buffer_local, "buffer", None) or io.BytesIO()
+        _buffer_local.buffer = None
+        buffered.seek(0)
+
+        if use_webp:
+            image.save(buffered, format="WEBP", quality=80, method=4)
+            mime_type = "image/webp"
+        else:
+            # Encode as baseline JPEG. The vision tower gains nothing from
+            # lossless input, and skipping Huffman optimization avoids a
+            # second pass over the pixels.
+            image.save(
+                buffered,
+                format="JPEG",
+                quality=85,
+                optimize=False,
+                progressive=False,
+                subsampling=2,
+            )
+            mime_type = "image/jpeg"
+        size = buffered.tell()
+
+        # Encode straight from a view of the buffer to avoid copying it. The
+        # views must be released before the buffer can be reused.
+        with buffered.getbuffer() as view, view[:size] as data:
+            encoded = base64.b64encode(data)
+
+        if size <= _MAX_POOLED_BUFFER:
+            _buffer_local.buffer = buffered
+
+        return mime_type, encoded.decode("ascii")
+
+    def _image_to_base64(
+        self,
+        image: ImageInput,
+        max_side: Optional[int],
+        image_format: ImageFormat = "jpeg",
+    ) -> Tuple[Optional[str], str]:
+        """
+        Encodes an image via `_pil_image_to_base64`, reusing cached results.
+
+        Only PIL images up to `_B64_CACHE_MAX_PIXELS` are cached, to bound the
+        cost of hashing their pixels.
+
+        Args:
+            image (ImageInput): The image to encode.
+            max_side (Optional[int]): Passed through to `_pil_image_to_base64`.
+            image_format (ImageFormat): Passed through to `_pil_image_to_base64`.
+
+        Returns:
+            Tuple[Optional[str], str]: The result of `_pil_image_to_base64`.
+        """
+        if (
+            not isinstance(image, Image.Image)
+            or image.width * image.height > _B64_CACHE_MAX_PIXELS
+        ):
+            return self._pil_image_to_base64(image, max_side, image_format)
+
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{image.mode}:{image.size}:{max_side}:{image_format}".encode())
+        hasher.update(image.tobytes())
+        if image.mode == "P":
+            hasher.update(bytes(image.getpalette() or []))
+        key = hasher.digest()
+
+        cached = self._b64_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._pil_image_to_base64(image, max_side, image_format)
+        with self._b64_cache_lock:
+            # Another thread may have encoded the same image meanwhile; keep
+            # its entry rather than evicting a valid one to insert a duplicate.
+            cached = self._b64_cache.get(key)
+            if cached is not None:
+                return cached
+            if len(self._b64_cache) >= _B64_CACHE_SIZE:
+                del self._b64_cache[next(iter(self._b64_cache))]
+            self._b64_cache[key] = result
+        return result
+
+    def _encode_images(
+        self,
+        images: List[ImageInput],
+        max_side: Optional[int],
+        image_format: ImageFormat = "jpeg",
+    ) -> List[Tuple[Optional[str], str]]:
+        """
+        Encodes a list of images, in parallel when there is more than one.
+
+        JPEG encoding releases the GIL, so a thread pool gives a near-linear
+        speedup across images.
+
+        Args:
+            images (List[ImageInput]): The images to encode.
+            max_side (Optional[int]): Passed through to `_pil_image_to_base64`.
+            image_format (ImageFormat): Passed through to `_pil_image_to_base64`.
+
+        Returns:
+            List[Tuple[Optional[str], str]]: The result of
+                `_pil_image_to_base64` for each image, in input order.
+        """
+        if len(images) == 1:
+            return [self._image_to_base64(images[0], max_side, image_format)]
+
+        with ThreadPoolExecutor(max_workers=min(8, len(images))) as executor:
+            return list(
+                executor.map(
+                    lambda image: self._image_to_base64(image, max_side, image_format),
+                    images,
+                )
+            )
+
+    @staticmethod
+    def _build_messages(
+        prompt: str,
+        system_prompt: Optional[str],
+        encoded_images: List[Tuple[Optional[str], str]],
+        chat_history: Optional[List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Builds the message list for a chat completions request.
+
+        Args:
+            prompt (str): The user's text prompt.
+            system_prompt (Optional[str]): An optional system-level instruction
+                                           for the model.
+            encoded_images (List[Tuple[Optional[str], str]]): The result of
+                `_pil_image_to_base64` for each image.
+            chat_history (Optional[List[Dict[str, Any]]]): The existing
+                                                           conversation history,
+                                                           which is not modified.
+
+        Returns:
+            List[Dict[str, Any]]: The messages to send to the server.
+        """
+        history = chat_history or []
+
+        # Add the system prompt to the message history if provided, unless the
+        # history already starts with one. Building the list in one go copies
+        # the history exactly once, which is needed anyway so that appending
+        # the user message below does not mutate the caller's list.
+        if system_prompt and not (history and history[0].get("role") == "system"):
+            messages = [_system_message(system_prompt), *history]
+        else:
+            messages = list(history)
+
+        # Prepare the content for the user's message, including text and images.
+        # Remote images have no MIME type and are sent as their URL.
+        user_content = [
+            {"type": "text", "text": prompt},
+            *(
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": base64_image
+                        if mime_type is None
+                        else (
+                            _DATA_URL_PREFIXES.get(mime_type)
+                            or f"data:{mime_type};base64,"
+                        )
+                        + base64_image
+                    }
+                }
+                for mime_type, base64_image in encoded_images
+            ),
+        ]
+
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
+    @staticmethod
+    def _build_extra_body(
+        kwargs: Dict[str, Any],
+        cache_prompt: bool,
+        keep_alive: Optional[Union[str, int]],
+    ) -> Dict[str, Any]:
+        """
+        Builds the `extra_body` for llama.cpp-specific request fields.
+
+        Any `extra_body` in `kwargs` is popped and merged, without mutating the
+        dict the caller passed in.
+
+        Args:
+            kwargs (Dict[str, Any]): The keyword arguments passed to `chat`.
+            cache_prompt (bool): Whether the server should reuse its KV cache.
+            keep_alive (Optional[Union[str, int]]): How long the server should
+                                                    keep the model loaded.
+
+        Returns:
+            Dict[str, Any]: The fields to send via `extra_body`.
+        """
+        extra_body = dict(kwargs.pop("extra_body", None) or {})
+        extra_body.setdefault("cache_prompt", cache_prompt)
+        if keep_alive is not None:
+            extra_body.setdefault("keep_alive", keep_alive)
+        return extra_body
 
     def chat(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        images: Optional[List[Image.Image]] = None,
+        images: Optional[List[ImageInput]] = None,
         chat_history: Optional[List[Dict[str, Any]]] = None,
         model: str = "gpt-4",
+        max_side: Optional[int] = 1024,
+        image_format: ImageFormat = "jpeg",
+        stream: bool = False,
+        cache_prompt: bool = True,
+        keep_alive: Optional[Union[str, int]] = None,
         **kwargs,
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
         """
         Sends a request to the chat completions endpoint of the llama.cpp server.
 
@@ -87,8 +807,11 @@ class LlamaLiteClient:
             prompt (str): The user's text prompt.
             system_prompt (Optional[str]): An optional system-level instruction
                                            for the model.
-            images (Optional[List[Image.Image]]): A list of PIL Image objects
-                                                  to be sent with the prompt.
+            images (Optional[List[ImageInput]]): A list of images to be sent
+                with the prompt. Each may be a PIL Image object, an RGB NumPy
+                array (uint8, or floats in [0, 1] or [0, 255]), encoded image
+                bytes, a file path, a data URL or an http(s) URL; encoded
+                images are sent without re-encoding.
             chat_history (Optional[List[Dict[str, Any]]]): An existing list of
                                                            messages representing
                                                            the conversation history.
@@ -96,38 +819,105 @@ class LlamaLiteClient:
                          required parameter for the OpenAI library, the actual
                          model used is determined by the llama.cpp server
                          configuration.
+            max_side (Optional[int]): The maximum length, in pixels, of an
+                                      image's longest side. Larger images are
+                                      downscaled before encoding, since vision
+                                      projectors typically operate well below
+                                      1024 px. None disables resizing.
+            image_format (ImageFormat): The format to encode PIL images to.
+                                        "webp" gives smaller payloads than
+                                        "jpeg", but requires a server build that
+                                        can decode WebP. Falls back to JPEG if
+                                        Pillow cannot write WebP.
+            stream (bool): If True, return an iterator over completion chunks
+                           as they are generated instead of waiting for the
+                           full completion. Each chunk's new text is in
+                           `chunk.choices[0].delta.content`.
+            cache_prompt (bool): Asks llama.cpp to reuse the KV cache from the
+                                 previous request, so that only the new part of
+                                 a conversation has to be processed. This is
+                                 the most effective performance setting for
+                                 multi-turn chats.
+            keep_alive (Optional[Union[str, int]]): How long the server should
+                                                    keep the model loaded after
+                                                    the request (e.g. "5m"), for
+                                                    servers that support it.
             **kwargs: Additional keyword arguments to be passed to the
                       OpenAI client's `chat.completions.create` method.
 
         Returns:
-            Dict[str, Any]: The response from the llama.cpp server, structured as
-                            an OpenAI API chat completion object.
+            Union[Dict[str, Any], Iterator[Dict[str, Any]]]: The response from
+                the llama.cpp server, structured as an OpenAI API chat
+                completion object, or an iterator of chat completion chunks
+                when `stream` is True.
         """
-        messages = chat_history.copy() if chat_history else []
+        encoded_images = (
+            self._encode_images(images, max_side, image_format) if images else []
+        )
+        messages = self._build_messages(
+            prompt, system_prompt, encoded_images, chat_history
+        )
+        extra_body = self._build_extra_body(kwargs, cache_prompt, keep_alive)
 
-        # Add the system prompt to the message history if provided.
-        if system_prompt and not any(m["role"] == "system" for m in messages):
-            messages.insert(0, {"role": "system", "content": system_prompt})
+        # Send the request to the server.
+        completion = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=stream,
+            extra_body=extra_body,
+            **kwargs
+        )
 
-        # Prepare the content for the user's message, including text and images.
-        user_content = [{"type": "text", "text": prompt}]
-        if images:
-            for image in images:
-                base64_image = self._pil_image_to_base64(image)
-                user_content.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_image}"
-                    }
-                })
+        return completion
 
-        messages.append({"role": "user", "content": user_content})
+    async def achat(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        images: Optional[List[ImageInput]] = None,
+        chat_history: Optional[List[Dict[str, Any]]] = None,
+        model: str = "gpt-4",
+        max_side: Optional[int] = 1024,
+        image_format: ImageFormat = "jpeg",
+        stream: bool = False,
+        cache_prompt: bool = True,
+        keep_alive: Optional[Union[str, int]] = None,
+        **kwargs,
+    ) -> Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]:
+        """
+        Asynchronous version of `chat`.
+
+        Concurrent calls share the client's connection pool, so many chats can
+        be in flight at once. The pool is bound to the running event loop:
+        call `aclose()` before the loop finishes. Images are encoded in a
+        worker thread to avoid blocking the event loop.
+
+        Args:
+            Same as `chat`.
+
+        Returns:
+            Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]: The chat
+                completion object, or an async iterator of chat completion
+                chunks when `stream` is True.
+        """
+        encoded_images = (
+            await asyncio.to_thread(
+                self._encode_images, images, max_side, image_format
+            )
+            if images
+            else []
+        )
+        messages = self._build_messages(
+            prompt, system_prompt, encoded_images, chat_history
+        )
+        extra_body = self._build_extra_body(kwargs, cache_prompt, keep_alive)
 
         # Send the request to the server.
-        completion = self.client.chat.completions.create(
+        completion = await self.aclient.chat.completions.create(
             model=model,
             messages=messages,
-            stream=False,  # As per requirement, no streaming.
+            stream=stream,
+            extra_body=extra_body,
             **kwargs
         )
 
@@ -0,0 +1,349 @@
+import asyncio
+import base64
+import gc
+import io
+import json
+import threading
+import types
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+import llamalite
+from llamalite import LlamaLiteClient
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """A minimal llama.cpp-like server that records the requests it receives."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(b'{"object": "list", "data": []}', "application/json")
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.loads(raw)
+        self.server.requests.append(
+            {"headers": self.headers, "raw": raw, "body": body}
+        )
+
+        if body.get("stream"):
+            events = [
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {"index": 0, "delta": {"content": word}, "finish_reason": None}
+                    ],
+                }
+                for word in ("Hello", " world")
+            ]
+            payload = "".join(f"data: {json.dumps(e)}\n\n" for e in events)
+            self._send((payload + "data: [DONE]\n\n").encode(), "text/event-stream")
+            return
+
+        completion = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "Hello world"},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+        self._send(json.dumps(completion).encode(), "application/json")
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    server.requests.clear()
+    client = LlamaLiteClient(
+        base_url=f"http://127.0.0.1:{server.server_port}/v1", warmup=False
+    )
+    yield client
+    client.close()
+
+
+def test_chat_serializes_body_with_orjson(server, client, monkeypatch):
+    orjson = pytest.importorskip("orjson")
+    calls = []
+
+    def dumps(obj):
+        calls.append(obj)
+        return orjson.dumps(obj)
+
+    monkeypatch.setattr(llamalite, "orjson", types.SimpleNamespace(dumps=dumps))
+
+    response = client.chat(prompt="Hi", system_prompt="Be brief.")
+
+    assert response.choices[0].message.content == "Hello world"
+    assert len(calls) == 1
+    (request,) = server.requests
+    assert request["raw"] == orjson.dumps(calls[0])
+    assert request["headers"]["Content-Type"] == "application/json"
+    assert request["body"]["cache_prompt"] is True
+    assert request["body"]["messages"][0] == {
+        "role": "system",
+        "content": "Be brief.",
+    }
+
+
+def _run_collecting_warnings(coro):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        result = asyncio.run(coro)
+        gc.collect()
+    return result, [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+
+def test_achat_works_across_event_loops(server, client):
+    async def achat_and_close():
+        try:
+            return await client.achat(prompt="Hi")
+        finally:
+            await client.aclose()
+
+    for _ in range(2):
+        response, leaks = _run_collecting_warnings(achat_and_close())
+        assert response.choices[0].message.content == "Hello world"
+        assert leaks == []
+
+    assert len(server.requests) == 2
+
+
+def test_achat_warns_when_aclose_is_skipped(server, client):
+    asyncio.run(client.achat(prompt="Hi"))
+
+    async def achat_and_close():
+        with pytest.warns(ResourceWarning, match="aclose"):
+            response = await client.achat(prompt="Hi")
+        await client.aclose()
+        return response
+
+    response, _ = _run_collecting_warnings(achat_and_close())
+    assert response.choices[0].message.content == "Hello world"
+
+
+def _image_urls(request):
+    return [
+        part["image_url"]["url"]
+        for part in request["body"]["messages"][-1]["content"]
+        if part["type"] == "image_url"
+    ]
+
+
+def test_chat_sends_encoded_images_as_is(server, client, tmp_path):
+    png = io.BytesIO()
+    Image.new("RGB", (4, 4), (255, 0, 0)).save(png, format="PNG")
+    png = png.getvalue()
+    path = tmp_path / "image.png"
+    path.write_bytes(png)
+    b64 = base64.b64encode(png).decode("ascii")
+
+    client.chat(
+        prompt="Describe these",
+        images=[
+            png,
+            str(path),
+            path,
+            f"data:image/png;base64,{b64}",
+            "data:image/svg+xml,%3Csvg%2F%3E",
+        ],
+    )
+
+    (request,) = server.requests
+    svg = base64.b64encode(b"<svg/>").decode("ascii")
+    assert _image_urls(request) == [
+        f"data:image/png;base64,{b64}",
+        f"data:image/png;base64,{b64}",
+        f"data:image/png;base64,{b64}",
+        f"data:image/png;base64,{b64}",
+        f"data:image/svg+xml;base64,{svg}",
+    ]
+
+
+def test_image_encodings_are_cached(client):
+    image = Image.new("RGB", (8, 8), (10, 20, 30))
+
+    first = client._image_to_base64(image, 1024)
+    assert client._image_to_base64(image.copy(), 1024) is first
+    assert len(client._b64_cache) == 1
+
+    client._image_to_base64(image, 4)
+    client._image_to_base64(image, 1024, "webp")
+    palette = image.convert("P")
+    client._image_to_base64(palette, 1024)
+    recolored = palette.copy()
+    recolored.putpalette([255, 0, 0] * 256)
+    client._image_to_base64(recolored, 1024)
+    assert len(client._b64_cache) == 5
+
+
+def test_image_cache_is_bounded(client):
+    for i in range(llamalite._B64_CACHE_SIZE + 5):
+        client._image_to_base64(Image.new("L", (4, 4), i), 1024)
+    assert len(client._b64_cache) == llamalite._B64_CACHE_SIZE
+
+
+
+def test_images_over_4mp_bypass_the_cache(client):
+    client._image_to_base64(Image.new("L", (2001, 2000)), 1024)
+    assert len(client._b64_cache) == 0
+
+
+def test_large_palette_image_is_downscaled_with_lanczos():
+    # A one-pixel checkerboard: NEAREST keeps pure black and white pixels,
+    # whereas LANCZOS averages them to grey.
+    checkerboard = Image.new("L", (2000, 1500))
+    checkerboard.putdata(
+        [255 * ((x + y) % 2) for y in range(1500) for x in range(2000)]
+    )
+    image = checkerboard.convert("P")
+
+    mime_type, b64 = LlamaLiteClient._pil_image_to_base64(image)
+
+    decoded = Image.open(io.BytesIO(base64.b64decode(b64))).convert("L")
+    assert mime_type == "image/jpeg"
+    assert decoded.size == (1024, 768)
+    assert 64 < decoded.getpixel((512, 384)) < 192
+
+
+def test_chat_passes_remote_image_urls_through(server, client):
+    url = "https://example.com/cat.png"
+
+    client.chat(prompt="Describe this", images=[url])
+
+    (request,) = server.requests
+    assert _image_urls(request) == [url]
+
+
+def test_encoded_images_get_their_real_mime_type():
+    bmp = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(bmp, format="BMP")
+    png = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(png, format="PNG")
+    png_b64 = base64.b64encode(png.getvalue()).decode("ascii")
+    encode = LlamaLiteClient._pil_image_to_base64
+
+    assert encode(bmp.getvalue())[0] == "image/bmp"
+    assert encode(f"data:;base64,{png_b64}") == ("image/png", png_b64)
+    # RFC 2397: data URLs without a MIME type default to text/plain.
+    assert encode("data:;base64,abc") == ("text/plain", "abc")
+    assert encode("data:,hello")[0] == "text/plain"
+    with pytest.raises(ValueError, match="recognized image format"):
+        encode(b"not an image")
+
+
+@pytest.mark.parametrize("use_cv2", [True, False])
+def test_chat_encodes_ndarray_images(server, client, monkeypatch, use_cv2):
+    np = pytest.importorskip("numpy")
+    if use_cv2:
+        pytest.importorskip("cv2")
+    else:
+        monkeypatch.setattr(llamalite, "cv2", None)
+
+    red = np.zeros((8, 16, 3), dtype=np.uint8)
+    red[..., 0] = 255
+    client.chat(
+        prompt="Describe these",
+        images=[red, red.astype(np.float32) / 255.0],
+    )
+
+    (request,) = server.requests
+    for url in _image_urls(request):
+        prefix, _, b64 = url.partition(",")
+        assert prefix == "data:image/jpeg;base64"
+        decoded = Image.open(io.BytesIO(base64.b64decode(b64))).convert("RGB")
+        assert decoded.size == (16, 8)
+        r, g, b = decoded.getpixel((8, 4))
+        assert r > 200 and g < 60 and b < 60
+
+
+@pytest.mark.parametrize("scale", [1.0, 255.0])
+def test_float_arrays_keep_their_values(scale):
+    np = pytest.importorskip("numpy")
+    grey = np.full((8, 8, 3), 128.0 / 255.0 * scale, dtype=np.float32)
+
+    assert int(llamalite._ndarray_to_uint8(grey)[0, 0, 0]) == 128
+
+
+def test_chat_rejects_unsupported_ndarray_dtype(client):
+    np = pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError, match="uint8"):
+        client.chat(prompt="Hi", images=[np.zeros((4, 4, 3), dtype=np.int64)])
+
+
+def test_chat_streams_chunks(server, client):
+    chunks = client.chat(prompt="Hi", stream=True)
+
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in chunks)
+
+    assert text == "Hello world"
+    (request,) = server.requests
+    assert request["body"]["stream"] is True
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_chat_sends_webp_images(server, client, as_array):
+    image = Image.new("RGB", (16, 8), (255, 0, 0))
+    if as_array:
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("cv2")
+        image = np.asarray(image)
+    elif not llamalite._WEBP_AVAILABLE:
+        pytest.skip("Pillow was built without WebP support")
+
+    client.chat(prompt="Describe this", images=[image], image_format="webp")
+
+    (request,) = server.requests
+    (url,) = _image_urls(request)
+    assert url.startswith("data:image/webp;base64,")
+
+
+def test_ndarray_webp_falls_back_to_jpeg_without_opencv_webp(monkeypatch):
+    np = pytest.importorskip("numpy")
+    cv2 = pytest.importorskip("cv2")
+    imencode = cv2.imencode
+
+    def imencode_without_webp(ext, *args, **kwargs):
+        if ext == ".webp":
+            raise cv2.error("WebP codec is not available")
+        return imencode(ext, *args, **kwargs)
+
+    monkeypatch.setattr(cv2, "imencode", imencode_without_webp)
+    image = np.zeros((8, 16, 3), dtype=np.uint8)
+
+    mime_type, _ = LlamaLiteClient._pil_image_to_base64(image, image_format="webp")
+
+    assert mime_type == "image/jpeg"